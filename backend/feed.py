@@ -0,0 +1,219 @@
+"""Diversification stage for the discovery feed.
+
+Candidates gathered from several OMDb seed searches are deduplicated by
+imdbID, near-duplicate titles (remakes, sequels, re-releases) are dropped
+using MinHash signatures with LSH banding to find candidate pairs, and the
+rest is reranked with MMR so the queue varies in both title and seed.
+"""
+import re
+import zlib
+from collections import defaultdict, namedtuple
+
+import torch
+
+# Words ignored when comparing titles
+STOP_WORDS = {"the", "a", "an", "and", "or", "in", "of", "to", "for", "is", "it", "be"}
+# Sequel words are dropped together with a number that follows them, so
+# "Deathly Hallows: Part 1" and "Part 2" share the same words
+SEQUEL_WORDS = {"part", "chapter", "episode", "vol", "volume"}
+NUMBER = re.compile(r"^(\d+|x{0,3}(ix|iv|v?i{0,3}))$")
+# Letters and digits in any script; apostrophes stay inside a word ("king's")
+WORD = re.compile(r"[^\W_]+(?:['\u2019][^\W_]+)*")
+
+TitleFeatures = namedtuple("TitleFeatures", "words significant tokens number")
+
+NUM_PERM = 32
+BANDS = 16
+ROWS = NUM_PERM // BANDS  # Band keys below pack exactly two rows into an int64
+# Titles with the same words apart from sequel markers, or with at least two
+# shared tokens covering half of their combined tokens, are near-duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.5
+MIN_SHARED_TOKENS = 2
+
+# Rerank penalties, on the same scale as the uniform [0, 1) random relevance
+TITLE_PENALTY = 1.0  # times the highest title similarity to any earlier pick
+SEED_PENALTY = 0.5  # per earlier pick from the same seed
+
+_PRIME = (1 << 31) - 1
+_generator = torch.Generator().manual_seed(42)
+_HASH_A = torch.randint(1, _PRIME, (NUM_PERM,), generator=_generator)
+_HASH_B = torch.randint(0, _PRIME, (NUM_PERM,), generator=_generator)
+
+
+def title_features(title):
+    """Return the TitleFeatures used to compare a title with others.
+
+    `words` is the lowercased title without sequel markers, `significant`
+    the same words in order without stop words, and `tokens` their set. A
+    trailing number ("Alien 3", "Rocky II") is split off into `number` so it
+    can tell "Apollo 13" from "Apollo 18" while "Alien" still matches
+    "Alien 3". Titles that are only a number, like "1917", keep it.
+    """
+    words = []
+    for word in WORD.findall(title.lower()):
+        if NUMBER.match(word) and words and words[-1] in SEQUEL_WORDS:
+            words.pop()
+        else:
+            words.append(word)
+    words = [w for w in words if w not in SEQUEL_WORDS]
+
+    number = None
+    if len(words) > 1 and NUMBER.match(words[-1]):
+        number = words.pop()
+
+    significant = tuple(w for w in words
+                        if w not in STOP_WORDS and (len(w) > 2 or w.isdigit()))
+    return TitleFeatures(tuple(words), significant, frozenset(significant), number)
+
+
+def dedupe_by_id(movies):
+    """Drop repeated imdbIDs, keeping the first occurrence."""
+    seen = set()
+    unique = []
+    for movie in movies:
+        imdb_id = movie.get("imdbID")
+        if imdb_id in seen:
+            continue
+        if imdb_id:
+            seen.add(imdb_id)
+        unique.append(movie)
+    return unique
+
+
+def minhash_signatures(token_sets):
+    """Compute a (len(token_sets), NUM_PERM) MinHash signature matrix.
+
+    Rows for empty token sets are filled with the hash modulus so they never
+    collide with real titles.
+    """
+    n = len(token_sets)
+    width = max((len(tokens) for tokens in token_sets), default=0)
+    if n == 0 or width == 0:
+        return torch.full((n, NUM_PERM), _PRIME, dtype=torch.long)
+
+    hashes = [[zlib.crc32(t.encode()) for t in tokens] + [0] * (width - len(tokens))
+              for tokens in token_sets]
+    mask = [[True] * len(tokens) + [False] * (width - len(tokens)) for tokens in token_sets]
+    ids = torch.tensor(hashes, dtype=torch.long)
+    mask = torch.tensor(mask, dtype=torch.bool)
+
+    # (n, width, NUM_PERM) universal hashes, padding masked out before the min
+    hashed = (ids.unsqueeze(-1) * _HASH_A + _HASH_B) % _PRIME
+    hashed.masked_fill_(~mask.unsqueeze(-1), _PRIME)
+    return hashed.min(dim=1).values
+
+
+def similar_titles(a, b):
+    """Return True if two TitleFeatures are near-duplicates.
+
+    Titles match when their tokens are identical, when they overlap enough by
+    Jaccard, when they open with the same two significant words ("Star Wars",
+    "Harry Potter"), or when one title of two or more words starts the other
+    ("The Matrix" and "The Matrix Reloaded"). Different trailing numbers
+    never match.
+    """
+    if a.number and b.number and a.number != b.number:
+        return False
+    if a.tokens and a.tokens == b.tokens:
+        return True
+
+    shared = len(a.tokens & b.tokens)
+    if shared >= MIN_SHARED_TOKENS and shared / len(a.tokens | b.tokens) >= NEAR_DUPLICATE_THRESHOLD:
+        return True
+    if len(a.significant) >= 2 and a.significant[:2] == b.significant[:2]:
+        return True
+
+    short, long = sorted((a.words, b.words), key=len)
+    return len(short) >= 2 and long[:len(short)] == short
+
+
+def near_duplicate_representatives(features, signatures):
+    """Return sorted indices keeping one item per near-duplicate group.
+
+    Candidate pairs come from LSH buckets over the MinHash signatures and
+    from titles sharing their first significant word. Items are visited in
+    order and dropped when a kept candidate passes `similar_titles`; only
+    kept items are compared against, so unrelated titles are never merged
+    transitively through a shared neighbour.
+    """
+    n = len(features)
+    candidates = defaultdict(set)
+    if n > 1:
+        bands = signatures.view(n, BANDS, ROWS)
+        band_keys = (bands[:, :, 0] * _PRIME + bands[:, :, 1]).tolist()
+        for band in range(BANDS):
+            buckets = defaultdict(list)
+            for i in range(n):
+                if features[i].tokens:
+                    buckets[band_keys[i][band]].append(i)
+            for members in buckets.values():
+                for a, i in enumerate(members):
+                    candidates[i].update(members[:a])
+
+    by_first_word = defaultdict(list)
+    keep = []
+    kept = set()
+    for i, title in enumerate(features):
+        first = title.significant[0] if title.significant else None
+        nearby = candidates[i].union(by_first_word[first]) if first else candidates[i]
+        if any(j in kept and similar_titles(title, features[j]) for j in nearby):
+            continue
+        keep.append(i)
+        kept.add(i)
+        if first:
+            by_first_word[first].append(i)
+    return keep
+
+
+def mmr_rerank(signatures, has_tokens, seeds, limit):
+    """Greedily pick up to `limit` indices by maximal marginal relevance.
+
+    Relevance is random so the feed stays shuffled. Each candidate is
+    penalised by its highest estimated title similarity to any earlier pick,
+    and by how many picks its seed already has. A candidate from the same
+    seed as the previous pick is only chosen when no other seed is left.
+    """
+    n = signatures.shape[0]
+    if n == 0:
+        return []
+
+    seed_codes = {}
+    seed_ids = torch.tensor([seed_codes.setdefault(s, len(seed_codes)) for s in seeds])
+    seed_counts = torch.zeros(len(seed_codes))
+    relevance = torch.rand(n)
+    title_sim = torch.zeros(n)
+    picked = torch.zeros(n, dtype=torch.bool)
+
+    order = []
+    for _ in range(min(limit, n)):
+        scores = relevance - TITLE_PENALTY * title_sim - SEED_PENALTY * seed_counts[seed_ids]
+        scores[picked] = float("-inf")
+        if order:
+            repeat = seed_ids == seed_ids[order[-1]]
+            if bool((~picked & ~repeat).any()):
+                scores[repeat] = float("-inf")
+        j = int(scores.argmax())
+        order.append(j)
+        picked[j] = True
+        seed_counts[seed_ids[j]] += 1
+
+        sim = (signatures == signatures[j]).float().mean(dim=1)
+        sim = sim * (has_tokens & has_tokens[j]).float()
+        title_sim = torch.maximum(title_sim, sim)
+    return order
+
+
+def diversify(movies, limit=25):
+    """Deduplicate and rerank candidate movies, returning at most `limit`."""
+    movies = dedupe_by_id(movies)
+    features = [title_features(m.get("Title", "")) for m in movies]
+    signatures = minhash_signatures([title.tokens for title in features])
+
+    keep = near_duplicate_representatives(features, signatures)
+    movies = [movies[i] for i in keep]
+    signatures = signatures.index_select(0, torch.tensor(keep, dtype=torch.long))
+    has_tokens = torch.tensor([bool(features[i].tokens) for i in keep], dtype=torch.bool)
+    seeds = [m.get("_seed") for m in movies]
+
+    order = mmr_rerank(signatures, has_tokens, seeds, limit)
+    return [movies[i] for i in order]
@@ -8,7 +8,7 @@ from pathlib import Path
 import torch
 import os
 
-from . import db, bcrypt, models
+from . import db, bcrypt, models, feed
 from .models import User, Movie
 
 from transformers import BertTokenizerFast, BertForSequenceClassification
@@ -86,8 +86,8 @@ def search_movies():
 def random_movies():
     """Return a queue of movies from diverse seed phrases for varied browsing.
     
-    Fetches from multiple seed phrases and deduplicates similar titles to ensure
-    variety and prevent movies with similar words from appearing consecutively.
+    Fetches from multiple seed phrases, drops repeated and near-duplicate titles
+    (remakes, sequels) across the whole batch and reranks for seed variety.
     Excludes movies the user has already liked or disliked.
     """
     seeds = ["star", "love", "matrix", "dark", "king", "war", "life", "space", "girl", "man", "boy", "night", "black", "dream", "time", "hero", "city", "world", "adventure", "journey", "quest", "legend", "myth", "future", "past", "ring", "ocean", "fire", "ice", "shadow", "light", "storm", "dragon", "wizard", "knight", "magic", "mystery", "crime", "action", "thriller", "romance", "comedy", "drama", "horror", "sci-fi", "western", "fantasy", "music", "sport", "history"]
@@ -126,36 +126,13 @@ def random_movies():
                    if m.get("Poster") and m.get("Poster") != "N/A" 
                    and m.get("imdbID") not in excluded_ids]
     
-    # Deduplicate: remove movies with too many overlapping words in titles
-    def get_title_words(title):
-        """Extract significant words from title (exclude common words)."""
-        common_words = {"the", "a", "an", "and", "or", "in", "of", "to", "for", "is", "it", "be"}
-        words = title.lower().split()
-        return set(w for w in words if w not in common_words and len(w) > 2)
-    
-    deduplicated = []
-    for movie in all_results:
-        title = movie.get("Title", "")
-        movie_words = get_title_words(title)
-        
-        # Check if this movie has too much overlap with recently added movies
-        has_significant_overlap = False
-        for recent_movie in deduplicated[-3:]:  # Check against last 3 movies
-            recent_words = get_title_words(recent_movie.get("Title", ""))
-            # If there's more than 1 significant word in common, consider it overlap
-            overlap = movie_words & recent_words
-            if len(overlap) > 1:
-                has_significant_overlap = True
-                break
-        
-        if not has_significant_overlap:
-            deduplicated.append(movie)
-    
-    # Shuffle to randomize order
-    random.shuffle(deduplicated)
+    # Deduplicate by imdbID and near-duplicate titles across the whole batch,
+    # then rerank to spread similar titles and seeds through the queue.
+    # Return up to 25 results for a fuller queue
+    diversified = feed.diversify(all_results, limit=25)
     
     return jsonify({
-        "results": deduplicated[:25],  # Return more results for a fuller queue
+        "results": diversified,
         "seeds_used": selected_seeds
     })
 
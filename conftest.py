@@ -0,0 +1,6 @@
+import os
+import sys
+
+# feed.py has no Flask dependencies; import it directly from backend/ so the
+# tests don't need the database stack that backend/__init__.py pulls in
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "backend"))
@@ -0,0 +1,108 @@
+import feed
+
+
+def movie(title, imdb_id, seed="star"):
+    return {"Title": title, "imdbID": imdb_id, "Poster": "poster.jpg", "_seed": seed}
+
+
+def titles(movies):
+    return {m["Title"] for m in movies}
+
+
+def test_dedupe_by_id_keeps_first_occurrence():
+    movies = [movie("Dark", "tt1", "dark"), movie("Dark", "tt1", "night"), movie("Night", "tt2")]
+    assert feed.dedupe_by_id(movies) == [movies[0], movies[2]]
+
+
+def test_dedupe_by_id_keeps_movies_without_id():
+    movies = [{"Title": "Untitled"}, {"Title": "Untitled"}]
+    assert len(feed.dedupe_by_id(movies)) == 2
+
+
+def test_sequel_markers_are_ignored():
+    assert feed.title_features("Alien 3").tokens == feed.title_features("Alien").tokens == {"alien"}
+    assert feed.title_features("Rocky XII").number == "xii"
+    assert feed.title_features("Mix Tape").tokens == {"mix", "tape"}
+    part_one = feed.title_features("Harry Potter and the Deathly Hallows: Part 1")
+    assert part_one == feed.title_features("Harry Potter and the Deathly Hallows: Part 2")
+
+
+def test_numbers_are_kept_when_they_identify_the_film():
+    assert feed.title_features("1917").tokens == {"1917"}
+    movies = [movie("Apollo 13", "tt1"), movie("Apollo 18", "tt2"),
+              movie("District 9", "tt3"), movie("District 13", "tt4"),
+              movie("300", "tt5"), movie("300", "tt6")]
+    assert titles(feed.diversify(movies, limit=10)) == {
+        "Apollo 13", "Apollo 18", "District 9", "District 13", "300"}
+
+
+def test_accented_titles_are_tokenised():
+    assert feed.title_features("Amélie").tokens == {"amélie"}
+    assert feed.title_features("Léon: The Professional").significant == ("léon", "professional")
+    movies = [movie("Amélie", "tt1"), movie("Lie", "tt2")]
+    assert len(feed.diversify(movies, limit=10)) == 2
+
+
+def test_franchise_and_sequels_collapse():
+    movies = [
+        movie("Star Wars: Episode IV - A New Hope", "tt1"),
+        movie("Star Wars: Episode V - The Empire Strikes Back", "tt2"),
+        movie("Star Wars", "tt3"),
+        movie("Alien", "tt4"),
+        movie("Alien 3", "tt5"),
+        movie("The Dark Knight", "tt6"),
+        movie("The Dark Knight Rises", "tt7"),
+    ]
+    result = feed.diversify(movies, limit=10)
+    assert titles(result) == {"Star Wars: Episode IV - A New Hope", "Alien", "The Dark Knight"}
+
+
+def test_matrix_films_collapse():
+    movies = [movie("The Matrix", "tt1", "matrix"),
+              movie("The Matrix Reloaded", "tt2", "matrix"),
+              movie("The Matrix Revolutions", "tt3", "matrix"),
+              movie("The Matrix Resurrections", "tt4", "matrix")]
+    assert titles(feed.diversify(movies, limit=10)) == {"The Matrix"}
+
+
+def test_harry_potter_films_collapse():
+    movies = [movie("Harry Potter and the Sorcerer's Stone", "tt1"),
+              movie("Harry Potter and the Chamber of Secrets", "tt2"),
+              movie("Harry Potter and the Deathly Hallows: Part 1", "tt3"),
+              movie("Harry Potter and the Deathly Hallows: Part 2", "tt4")]
+    assert len(feed.diversify(movies, limit=10)) == 1
+
+
+def test_unrelated_titles_sharing_a_seed_word_are_kept():
+    king = ["The King", "King Kong", "The Lion King", "The King's Speech",
+            "King Richard", "The Return of the King", "Burger King",
+            "King: A Filmed Record... Montgomery to Memphis"]
+    love = ["Love", "Love Actually", "Love, Rosie", "Love, Simon",
+            "Shakespeare in Love", "P.S. I Love You"]
+    hero = ["Hero", "Hero: Love Story of a Spy", "Dragon", "Dragon: The Bruce Lee Story"]
+    movies = ([movie(t, f"tk{i}", "king") for i, t in enumerate(king)]
+              + [movie(t, f"tl{i}", "love") for i, t in enumerate(love)]
+              + [movie(t, f"th{i}", "hero") for i, t in enumerate(hero)])
+    result = feed.diversify(movies, limit=len(movies))
+    assert titles(result) == set(king) | set(love) | set(hero)
+
+
+def test_empty_titles_are_not_merged():
+    movies = [movie("", "tt1"), movie("", "tt2"), {"imdbID": "tt3", "_seed": "star"}]
+    assert len(feed.diversify(movies, limit=10)) == 3
+
+
+def test_seeds_alternate_while_several_remain():
+    movies = [movie(f"Title{seed}{i} Word{i}", f"{seed}{i}", seed)
+              for seed in ("star", "love", "war") for i in range(5)]
+    for _ in range(200):
+        seeds = [m["_seed"] for m in feed.diversify(movies, limit=len(movies))]
+        for k in range(1, len(seeds)):
+            if seeds[k] == seeds[k - 1]:
+                assert set(seeds[k:]) == {seeds[k]}
+
+
+def test_diversify_respects_limit_and_empty_input():
+    movies = [movie(f"Film{i} Story{i}", f"tt{i}") for i in range(40)]
+    assert len(feed.diversify(movies, limit=25)) == 25
+    assert feed.diversify([], limit=25) == []